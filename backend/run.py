@@ -0,0 +1,22 @@
+"""
+Launch the API with uvloop and httptools.
+
+Kept apart from server.py: the extraction pool spawns workers that re-import the
+main module, and this one is cheap to import (equivalently: `uvicorn server:app`).
+"""
+
+import os
+
+import uvicorn
+
+if __name__ == "__main__":
+    # Each worker process imports server.py and opens its own Motor pool. Job progress is
+    # broadcast in-process, so raise WEB_CONCURRENCY only behind sticky WebSocket routing.
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 8001)),
+        workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+        loop="uvloop",
+        http="httptools"
+    )
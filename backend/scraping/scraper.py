@@ -1,57 +1,137 @@
 import asyncio
 import aiohttp
 import logging
-from bs4 import BeautifulSoup
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from playwright.async_api import async_playwright
-from typing import List, Dict, Any, Optional
+from pymongo import UpdateOne
+from pymongo.write_concern import WriteConcern
+from typing import List, Dict, Any, Optional, Set
 from datetime import datetime, timezone, timedelta
-import json
+import orjson
 import time
 from urllib.parse import urljoin, urlparse
-import re
 
-from .models import ScrapedData, PersonData, CachedScrapeData
+from .models import ScrapedData, CachedScrapeData
 from .utils import (
-    RateLimiter, extract_phone_numbers, extract_emails, 
-    extract_social_media_urls, extract_persons_data, 
-    clean_url, is_url_recently_scraped
+    RateLimiter, extract_page_data,
+    clean_url, get_domain, is_url_recently_scraped
 )
 
 logger = logging.getLogger(__name__)
 
+_BASE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'br, gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Pages are read in chunks and truncated past this size to bound memory per URL
+_MAX_BODY_BYTES = 4_000_000
+_READ_CHUNK_BYTES = 64 * 1024
+
+# Scraped results are upserted in batches, flushed when full or after _INSERT_FLUSH_INTERVAL
+# seconds so slow jobs still show partial results; job progress is written at most every
+# _PROGRESS_INTERVAL seconds
+_INSERT_BATCH_SIZE = 200
+_INSERT_FLUSH_INTERVAL = 1.0
+_PROGRESS_INTERVAL = 0.25
+
 class ScrapingEngine:
     def __init__(self, db, connection_manager):
         self.db = db
+        # Intermediate result batches are transient and rewritten on re-scrape, so skip the ack
+        # round-trip; the final batch and job state keep the default acknowledged write concern
+        self.scraped_data = db.get_collection('scraped_data', write_concern=WriteConcern(w=0))
         self.connection_manager = connection_manager
         self.rate_limiter = RateLimiter(max_requests_per_domain=2, time_window=60)
-        self.user_agents = [
+        # Power-of-two length so a bitmask picks the index
+        self.user_agents = (
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
-        ]
+            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+        )
+        # One stable User-Agent per host keeps UA-sensitive sites on the same keep-alive connection
+        self._ua_for_domain: Dict[str, str] = {}
+        # Hosts where plain HTTP scraping has worked; Playwright is never tried for them
+        self._static_hosts: Set[str] = set()
         self.session = None
+        self._pool = None
+        self._pw = None
+        self._browser = None
+        self._browser_lock = asyncio.Lock()
         
     async def get_session(self):
         if not self.session or self.session.closed:
             timeout = aiohttp.ClientTimeout(total=30, connect=10)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            # Reuse keep-alive connections per host and cache DNS lookups across URLs
+            connector = aiohttp.TCPConnector(limit=200, limit_per_host=8, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
         return self.session
     
+    def get_pool(self) -> ProcessPoolExecutor:
+        if not self._pool:
+            # Spawned (not forked) workers so children never inherit the event loop or DB client.
+            # Kept for the engine's lifetime so jobs reuse warm workers and their per-process caches.
+            self._pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+    
+    def user_agent_for(self, url: str) -> str:
+        """Pick the User-Agent for a URL, memoized per host"""
+        domain = get_domain(url)
+        if domain not in self._ua_for_domain:
+            self._ua_for_domain[domain] = self.user_agents[hash(domain) & 3]
+        return self._ua_for_domain[domain]
+    
+    async def _ensure_browser(self):
+        """Launch the shared Chromium instance once and reuse it across URLs"""
+        async with self._browser_lock:
+            if not self._browser or not self._browser.is_connected():
+                if not self._pw:
+                    self._pw = await async_playwright().start()
+                self._browser = await self._pw.chromium.launch(headless=True)
+        return self._browser
+    
     async def close_session(self):
+        """Release the HTTP session, extraction pool and browser shared by all jobs; call on app shutdown"""
         if self.session and not self.session.closed:
             await self.session.close()
+        
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        
+        async with self._browser_lock:
+            if self._browser:
+                await self._browser.close()
+                self._browser = None
+            if self._pw:
+                await self._pw.stop()
+                self._pw = None
     
-    async def check_cache(self, url: str) -> Optional[ScrapedData]:
-        """Check if URL was scraped recently (within 3 months)"""
+    async def check_cache_bulk(self, urls: List[str]) -> Dict[str, ScrapedData]:
+        """Look up recent cache entries for many URLs in a single query"""
         try:
-            cached = await self.db.scraped_cache.find_one({"url": url})
-            if cached and is_url_recently_scraped(cached.get('last_scraped'), cache_days=90):
-                logger.info(f"Using cached data for {url}")
-                return ScrapedData(**cached['data'])
-            return None
+            cursor = self.db.scraped_cache.find(
+                {"url": {"$in": urls}},
+                {"url": 1, "data": 1, "last_scraped": 1}
+            )
+            return {
+                cached['url']: ScrapedData(**cached['data'])
+                async for cached in cursor
+                if is_url_recently_scraped(cached.get('last_scraped'), cache_days=90)
+            }
         except Exception as e:
-            logger.error(f"Error checking cache for {url}: {e}")
-            return None
+            logger.error(f"Error checking cache for {len(urls)} URLs: {e}")
+            return {}
     
     async def save_to_cache(self, url: str, data: ScrapedData):
         """Save scraped data to cache"""
@@ -65,42 +145,45 @@ class ScrapingEngine:
             
             await self.db.scraped_cache.replace_one(
                 {"url": url},
-                cache_entry.dict(),
+                cache_entry.model_dump(),
                 upsert=True
             )
         except Exception as e:
             logger.error(f"Error saving to cache for {url}: {e}")
     
+    async def read_html(self, response: aiohttp.ClientResponse) -> str:
+        """Read a response body up to _MAX_BODY_BYTES and decode it with the declared charset"""
+        chunks = []
+        total = 0
+        async for chunk in response.content.iter_chunked(_READ_CHUNK_BYTES):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= _MAX_BODY_BYTES:
+                logger.warning(f"Truncating {response.url} at {_MAX_BODY_BYTES} bytes")
+                break
+        
+        raw = b''.join(chunks)[:_MAX_BODY_BYTES]
+        try:
+            return raw.decode(response.charset or 'utf-8', errors='replace')
+        except LookupError:
+            return raw.decode('utf-8', errors='replace')
+    
     async def scrape_with_requests(self, url: str) -> Optional[Dict[str, Any]]:
-        """Scrape using aiohttp + BeautifulSoup (faster method)"""
+        """Scrape using aiohttp + selectolax (faster method)"""
         try:
             await self.rate_limiter.wait_for_slot(url)
             
             session = await self.get_session()
-            headers = {
-                'User-Agent': self.user_agents[hash(url) % len(self.user_agents)],
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
+            headers = {**_BASE_HEADERS, 'User-Agent': self.user_agent_for(url)}
             
             async with session.get(url, headers=headers, allow_redirects=True) as response:
                 if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    # Remove script and style elements
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-                    
-                    text_content = soup.get_text()
+                    html = await self.read_html(response)
                     
+                    # Parsing and text extraction happen in the extraction worker
                     return {
                         'html': html,
-                        'text': text_content,
-                        'soup': soup,
+                        # Label kept as 'beautifulsoup' for compatibility with stored results
                         'method': 'beautifulsoup'
                     }
                 else:
@@ -116,141 +199,83 @@ class ScrapingEngine:
         try:
             await self.rate_limiter.wait_for_slot(url)
             
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent=self.user_agents[hash(url) % len(self.user_agents)],
-                    viewport={'width': 1920, 'height': 1080}
-                )
-                
+            browser = await self._ensure_browser()
+            context = await browser.new_context(
+                user_agent=self.user_agent_for(url),
+                viewport={'width': 1920, 'height': 1080}
+            )
+            
+            try:
                 page = await context.new_page()
+                await page.goto(url, wait_until='networkidle', timeout=30000)
+                await page.wait_for_timeout(2000)  # Wait for dynamic content
                 
-                try:
-                    await page.goto(url, wait_until='networkidle', timeout=30000)
-                    await page.wait_for_timeout(2000)  # Wait for dynamic content
-                    
-                    html = await page.content()
-                    text_content = await page.inner_text('body')
-                    
-                    await browser.close()
-                    
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    return {
-                        'html': html,
-                        'text': text_content,
-                        'soup': soup,
-                        'method': 'playwright'
-                    }
-                    
-                except Exception as e:
-                    await browser.close()
-                    raise e
+                html = await page.content()
+            finally:
+                await context.close()
+            
+            # Text is derived from the rendered HTML in the extraction worker, saving a CDP round-trip
+            return {
+                'html': html,
+                'method': 'playwright'
+            }
                     
         except Exception as e:
             logger.error(f"Error scraping {url} with Playwright: {e}")
             return None
     
-    def extract_company_address(self, soup, text_content: str) -> str:
-        """Extract company address from content"""
-        address = ""
-        
-        # Look for address patterns
-        address_patterns = [
-            r'\d+\s+[A-Z][a-z]+\s+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln)[.,\s]+[A-Z][a-z]+[.,\s]+[A-Z]{2}\s+\d{5}',
-            r'[A-Z][a-z]+[.,\s]+[A-Z]{2}\s+\d{5}',
-        ]
-        
-        # Look in structured data
-        address_selectors = [
-            '[itemtype*="PostalAddress"]',
-            '.address',
-            '#address',
-            '[class*="address"]',
-            '[class*="location"]',
-            '.contact-info'
-        ]
-        
-        for selector in address_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                text = element.get_text(strip=True)
-                if len(text) > 10 and any(word in text.lower() for word in ['street', 'avenue', 'road', 'drive']):
-                    address = text
-                    break
-            if address:
-                break
-        
-        if not address:
-            for pattern in address_patterns:
-                matches = re.findall(pattern, text_content)
-                if matches:
-                    address = matches[0]
-                    break
-        
-        return address[:200]  # Limit length
-    
     async def extract_data_from_content(self, content_data: Dict[str, Any], url: str) -> ScrapedData:
         """Extract all relevant data from scraped content"""
-        html = content_data['html']
-        text_content = content_data['text']
-        soup = content_data['soup']
-        method = content_data['method']
-        
-        # Extract phone numbers
-        phone_numbers = extract_phone_numbers(text_content)
-        
-        # Extract emails
-        emails = extract_emails(text_content)
-        primary_email = emails[0] if emails else ""
-        
-        # Extract social media URLs
-        social_urls = extract_social_media_urls(text_content, html)
-        
-        # Extract persons data
-        persons_data = extract_persons_data(text_content, html)
-        persons = [PersonData(**person) for person in persons_data]
-        
-        # Extract company address
-        company_address = self.extract_company_address(soup, text_content)
+        # Parsing and extraction are CPU-bound; run them in a worker process so they use other cores
+        loop = asyncio.get_running_loop()
+        pool = self.get_pool()
+        try:
+            extracted = await loop.run_in_executor(pool, extract_page_data, content_data['html'])
+        except BrokenProcessPool:
+            # A dead worker (OOM kill, native crash) breaks the whole pool; replace it once and retry
+            if self._pool is pool:
+                logger.warning("Extraction pool is broken, starting a new one")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            extracted = await loop.run_in_executor(
+                self.get_pool(), extract_page_data, content_data['html']
+            )
         
         scraped_data = ScrapedData(
             job_id="",  # Will be set by caller
             url=url,
-            phone_numbers=phone_numbers,
-            email_address=primary_email,
-            linkedin_url=social_urls['linkedin_url'],
-            facebook_url=social_urls['facebook_url'],
-            instagram_url=social_urls['instagram_url'],
-            github_url=social_urls['github_url'],
-            persons=persons,
-            company_address=company_address,
+            **extracted,
             scraped_at=datetime.now(timezone.utc),
-            scraping_method=method,
+            scraping_method=content_data['method'],
             success=True
         )
         
         return scraped_data
     
     async def scrape_single_url(self, url: str, job_id: str) -> ScrapedData:
-        """Scrape a single URL with fallback strategy"""
+        """Scrape a single URL with fallback strategy; the cache is checked in bulk by scrape_urls"""
         url = clean_url(url)
         
-        # Check cache first
-        cached_data = await self.check_cache(url)
-        if cached_data:
-            cached_data.job_id = job_id
-            return cached_data
-        
         scraped_data = None
         
         try:
-            # Try BeautifulSoup first (faster)
+            # Try a plain HTTP fetch first (faster)
             content_data = await self.scrape_with_requests(url)
             
             if content_data:
                 scraped_data = await self.extract_data_from_content(content_data, url)
-                logger.info(f"Successfully scraped {url} with BeautifulSoup")
+                self._static_hosts.add(get_domain(url))
+                logger.info(f"Successfully scraped {url} over HTTP")
+            elif get_domain(url) in self._static_hosts:
+                # The host has served plain HTML before, so a browser won't fix this URL
+                scraped_data = ScrapedData(
+                    job_id=job_id,
+                    url=url,
+                    scraped_at=datetime.now(timezone.utc),
+                    success=False,
+                    error="Failed to scrape; skipped Playwright for static host"
+                )
+                logger.error(f"Failed to scrape {url}; skipped Playwright for static host")
             else:
                 # Fallback to Playwright for JavaScript-heavy sites
                 logger.info(f"Trying Playwright for {url}")
@@ -306,7 +331,7 @@ class ScrapingEngine:
                 }
             )
             
-            # Send WebSocket update (ensure all data is JSON serializable)
+            # Send WebSocket update (orjson serializes datetime objects natively)
             message = {
                 "type": "progress_update",
                 "job_id": str(job_id),
@@ -314,10 +339,10 @@ class ScrapingEngine:
                 "completed": int(completed),
                 "total": int(total),
                 "failed": int(failed),
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": datetime.now(timezone.utc)
             }
             
-            await self.connection_manager.broadcast(json.dumps(message))
+            await self.connection_manager.broadcast(orjson.dumps(message).decode())
             
         except Exception as e:
             logger.error(f"Error updating job progress: {e}")
@@ -325,6 +350,8 @@ class ScrapingEngine:
     async def scrape_urls(self, urls: List[str], job_id: str, max_threads: int = 5):
         """Scrape multiple URLs with threading and progress tracking"""
         try:
+            # Drop duplicate URLs so each is scraped once per job
+            urls = list(dict.fromkeys(clean_url(url) for url in urls))
             total_urls = len(urls)
             completed = 0
             failed = 0
@@ -335,81 +362,153 @@ class ScrapingEngine:
                 {"$set": {"status": "in_progress", "total_urls": total_urls}}
             )
             
-            # Create semaphore for controlling concurrency
-            semaphore = asyncio.Semaphore(max_threads)
+            insert_buffer = []
+            buffer_lock = asyncio.Lock()
+            progress_dirty = asyncio.Event()
+            scraping_done = asyncio.Event()
             
-            async def scrape_with_semaphore(url: str, index: int):
-                nonlocal completed, failed
-                
-                async with semaphore:
+            async def flush_results(acknowledged: bool = False):
+                nonlocal insert_buffer
+                collection = self.db.scraped_data if acknowledged else self.scraped_data
+                async with buffer_lock:
+                    batch, insert_buffer = insert_buffer, []
+                    if batch:
+                        # Upsert on (url, job_id) so re-scraped URLs replace their row instead of piling up
+                        await collection.bulk_write([
+                            UpdateOne({"url": doc["url"], "job_id": doc["job_id"]}, {"$set": doc}, upsert=True)
+                            for doc in batch
+                        ], ordered=False)
+            
+            async def save_result(result: ScrapedData):
+                async with buffer_lock:
+                    insert_buffer.append(result.model_dump())
+                    if len(insert_buffer) < _INSERT_BATCH_SIZE:
+                        return
+                await flush_results()
+            
+            async def progress_flusher():
+                # Coalesce per-URL progress into at most one write/broadcast per interval
+                last_results_flush = time.monotonic()
+                while not scraping_done.is_set():
                     try:
-                        # Send start message
-                        start_message = {
-                            "type": "url_start",
-                            "job_id": str(job_id),
-                            "url": str(url),
-                            "index": int(index),
-                            "timestamp": datetime.now(timezone.utc).isoformat()
-                        }
-                        await self.connection_manager.broadcast(json.dumps(start_message))
-                        
-                        result = await self.scrape_single_url(url, job_id)
-                        
-                        # Save to database
-                        await self.db.scraped_data.insert_one(result.dict())
-                        
-                        if result.success:
-                            completed += 1
-                        else:
-                            failed += 1
-                        
-                        # Send completion message (serialize datetime objects)
-                        result_data = None
-                        if result.success and result:
-                            result_data = result.dict()
-                            # Convert datetime to ISO string for JSON serialization
-                            if "scraped_at" in result_data and result_data["scraped_at"]:
-                                result_data["scraped_at"] = result_data["scraped_at"].isoformat()
-                        
-                        complete_message = {
-                            "type": "url_complete",
-                            "job_id": str(job_id),
-                            "url": str(url),
-                            "index": int(index),
-                            "success": bool(result.success),
-                            "data": result_data,
-                            "error": str(result.error) if result.error else None,
-                            "timestamp": datetime.now(timezone.utc).isoformat()
-                        }
-                        await self.connection_manager.broadcast(json.dumps(complete_message))
-                        
-                        # Update progress
-                        await self.update_job_progress(job_id, completed, total_urls, failed)
-                        
-                    except Exception as e:
-                        failed += 1
-                        logger.error(f"Error in scrape_with_semaphore for {url}: {e}")
-                        
-                        error_message = {
-                            "type": "url_error",
-                            "job_id": str(job_id),
-                            "url": str(url),
-                            "index": int(index),
-                            "error": str(e),
-                            "timestamp": datetime.now(timezone.utc).isoformat()
-                        }
-                        await self.connection_manager.broadcast(json.dumps(error_message))
-                        
+                        await asyncio.wait_for(scraping_done.wait(), timeout=_PROGRESS_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                    if time.monotonic() - last_results_flush >= _INSERT_FLUSH_INTERVAL:
+                        last_results_flush = time.monotonic()
+                        try:
+                            await flush_results()
+                        except Exception as e:
+                            logger.error(f"Error saving results for job {job_id}: {e}")
+                    # The final progress write marks the job completed, so it is left to the code
+                    # after the acknowledged last flush; otherwise clients could read partial results
+                    if scraping_done.is_set() or completed + failed >= total_urls:
+                        break
+                    if progress_dirty.is_set():
+                        progress_dirty.clear()
                         await self.update_job_progress(job_id, completed, total_urls, failed)
             
-            # Create tasks for all URLs with their indices to maintain order
-            tasks = []
+            async def record_result(url: str, index: int, result: ScrapedData):
+                nonlocal completed, failed
+                
+                # Save to database
+                await save_result(result)
+                
+                if result.success:
+                    completed += 1
+                else:
+                    failed += 1
+                
+                # Send completion message (orjson serializes datetime objects)
+                result_data = result.model_dump() if result.success else None
+                
+                complete_message = {
+                    "type": "url_complete",
+                    "job_id": str(job_id),
+                    "url": str(url),
+                    "index": int(index),
+                    "success": bool(result.success),
+                    "data": result_data,
+                    "error": str(result.error) if result.error else None,
+                    "timestamp": datetime.now(timezone.utc)
+                }
+                await self.connection_manager.broadcast(orjson.dumps(complete_message).decode())
+                
+                # Update progress
+                progress_dirty.set()
+            
+            async def scrape_one(url: str, index: int):
+                nonlocal failed
+                
+                try:
+                    # Send start message
+                    start_message = {
+                        "type": "url_start",
+                        "job_id": str(job_id),
+                        "url": str(url),
+                        "index": int(index),
+                        "timestamp": datetime.now(timezone.utc)
+                    }
+                    await self.connection_manager.broadcast(orjson.dumps(start_message).decode())
+                    
+                    result = await self.scrape_single_url(url, job_id)
+                    await record_result(url, index, result)
+                    
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Error in scrape_one for {url}: {e}")
+                    
+                    error_message = {
+                        "type": "url_error",
+                        "job_id": str(job_id),
+                        "url": str(url),
+                        "index": int(index),
+                        "error": str(e),
+                        "timestamp": datetime.now(timezone.utc)
+                    }
+                    await self.connection_manager.broadcast(orjson.dumps(error_message).decode())
+                    
+                    progress_dirty.set()
+            
+            # Resolve cache hits up front with one query; only misses go to the workers
+            cached_results = await self.check_cache_bulk(urls)
+            
+            # Queue URLs with their indices to maintain order; the worker count bounds concurrency
+            queue = asyncio.Queue()
             for index, url in enumerate(urls):
-                task = asyncio.create_task(scrape_with_semaphore(url, index))
-                tasks.append(task)
+                if url not in cached_results:
+                    queue.put_nowait((index, url))
+            
+            async def worker():
+                while True:
+                    try:
+                        index, url = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    await scrape_one(url, index)
+            
+            progress_task = asyncio.create_task(progress_flusher())
+            workers = [asyncio.create_task(worker()) for _ in range(min(max_threads, queue.qsize()))]
             
-            # Wait for all tasks to complete
-            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                for index, url in enumerate(urls):
+                    cached_data = cached_results.get(url)
+                    if cached_data:
+                        logger.info(f"Using cached data for {url}")
+                        cached_data.job_id = job_id
+                        await record_result(url, index, cached_data)
+                        # Yield per hit so WebSocket relays and workers run between cached results
+                        await asyncio.sleep(0)
+                
+                # Wait for all workers to complete
+                await asyncio.gather(*workers, return_exceptions=True)
+            finally:
+                scraping_done.set()
+                await progress_task
+            
+            # Write remaining results acknowledged, so they are stored before the job reads as completed
+            await flush_results(acknowledged=True)
+            await self.update_job_progress(job_id, completed, total_urls, failed)
             
             # Mark job as completed
             await self.db.scraping_jobs.update_one(
@@ -429,9 +528,9 @@ class ScrapingEngine:
                 "total": int(total_urls),
                 "completed": int(completed),
                 "failed": int(failed),
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": datetime.now(timezone.utc)
             }
-            await self.connection_manager.broadcast(json.dumps(final_message))
+            await self.connection_manager.broadcast(orjson.dumps(final_message).decode())
             
             logger.info(f"Job {job_id} completed: {completed} successful, {failed} failed out of {total_urls}")
             
@@ -448,9 +547,6 @@ class ScrapingEngine:
                 "type": "job_error",
                 "job_id": str(job_id),
                 "error": str(e),
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": datetime.now(timezone.utc)
             }
-            await self.connection_manager.broadcast(json.dumps(error_message))
-        
-        finally:
-            await self.close_session()
\ No newline at end of file
+            await self.connection_manager.broadcast(orjson.dumps(error_message).decode())
\ No newline at end of file
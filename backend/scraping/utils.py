@@ -1,103 +1,152 @@
 import re
 import phonenumbers
 from phonenumbers import NumberParseException
-from typing import List, Set
+from typing import List, Optional, Set
 import asyncio
-from collections import defaultdict
+import functools
+from collections import defaultdict, deque
 import time
 from urllib.parse import urlparse
 import logging
+from selectolax.lexbor import LexborHTMLParser
 
 logger = logging.getLogger(__name__)
 
+# Common phone number patterns
+_PHONE_RES = [
+    re.compile(r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'),
+    re.compile(r'\+?\d{10,15}'),
+    re.compile(r'\(\d{3}\)\s?\d{3}[-.\s]?\d{4}'),
+    re.compile(r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}'),
+    re.compile(r'\+\d{1,3}\s?\d{1,14}'),
+]
+_NONDIGIT_RE = re.compile(r'[^\d+]')
+
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_SKIP_EMAIL_DOMAINS = frozenset({'example.com', 'test.com', 'domain.com', 'email.com'})
+_SKIP_EMAIL_SUFFIXES = ('.png', '.jpg')
+
+_SOCIAL_URL_CHARS = r'[A-Za-z0-9\-._~:/?#[\]@!$&\'()*+,;=]+'
+_SOCIAL_RES = {
+    social_type: [
+        re.compile(r'https?://(?:www\.)?' + domain + _SOCIAL_URL_CHARS, re.IGNORECASE),
+        re.compile(domain + _SOCIAL_URL_CHARS, re.IGNORECASE),
+    ]
+    for social_type, domain in (
+        ('linkedin_url', r'linkedin\.com/(?:company|in)/'),
+        ('facebook_url', r'facebook\.com/'),
+        ('instagram_url', r'instagram\.com/'),
+        ('github_url', r'github\.com/'),
+    )
+}
+
+# Look for address patterns
+_ADDRESS_RES = [
+    re.compile(r'\d+\s+[A-Z][a-z]+\s+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln)[.,\s]+[A-Z][a-z]+[.,\s]+[A-Z]{2}\s+\d{5}'),
+    re.compile(r'[A-Z][a-z]+[.,\s]+[A-Z]{2}\s+\d{5}'),
+]
+_ADDRESS_SELECTOR = (
+    '[itemtype*="PostalAddress"], .address, #address, '
+    '[class*="address"], [class*="location"], .contact-info'
+)
+_ADDRESS_KEYWORDS_RE = re.compile(r'street|avenue|road|drive', re.IGNORECASE)
+
+# Pattern for "Name - Title" or "Name, Title"
+_NAME_TITLE_RE = re.compile(r'([A-Z][a-z]+ [A-Z][a-z]+)\s*[-,]\s*([A-Z][^.!?]*?)(?=[.!?]|\n|$)')
+
+@functools.lru_cache(maxsize=4096)
+def get_domain(url: str) -> str:
+    """Return the host part of a URL, memoized since the same URLs are checked repeatedly"""
+    return urlparse(url).netloc
+
 class RateLimiter:
     def __init__(self, max_requests_per_domain: int = 3, time_window: int = 60):
         self.max_requests = max_requests_per_domain
         self.time_window = time_window
-        self.domain_requests = defaultdict(list)
-        self.lock = asyncio.Lock()
+        # Last max_requests timestamps per domain, oldest first
+        self.domain_requests = defaultdict(lambda: deque(maxlen=self.max_requests))
+        # Waiters queue per domain so one busy domain never blocks another
+        self.domain_locks = defaultdict(asyncio.Lock)
+    
+    def _try_consume(self, domain: str, now: float) -> bool:
+        requests = self.domain_requests[domain]
+        # The window has room unless the deque is full and its oldest entry is still inside it;
+        # appending to a full deque evicts that oldest entry
+        if len(requests) < self.max_requests or now - requests[0] >= self.time_window:
+            requests.append(now)
+            return True
+        return False
     
     async def can_make_request(self, url: str) -> bool:
-        domain = urlparse(url).netloc
-        async with self.lock:
-            now = time.time()
-            # Clean old requests
-            self.domain_requests[domain] = [
-                req_time for req_time in self.domain_requests[domain]
-                if now - req_time < self.time_window
-            ]
-            
-            if len(self.domain_requests[domain]) < self.max_requests:
-                self.domain_requests[domain].append(now)
-                return True
-            return False
+        domain = get_domain(url)
+        return self._try_consume(domain, time.time())
     
     async def wait_for_slot(self, url: str):
-        while not await self.can_make_request(url):
-            await asyncio.sleep(1)
+        domain = get_domain(url)
+        async with self.domain_locks[domain]:
+            while True:
+                now = time.time()
+                if self._try_consume(domain, now):
+                    return
+                # Sleep exactly until the oldest request leaves the window
+                await asyncio.sleep(self.time_window - (now - self.domain_requests[domain][0]))
+
+@functools.lru_cache(maxsize=10000)
+def _to_e164(cleaned: str) -> Optional[str]:
+    """Validate a cleaned candidate and format it as E164, or None if invalid"""
+    try:
+        # Try to parse as US number first, then international
+        if not cleaned.startswith('+'):
+            try:
+                parsed = phonenumbers.parse(cleaned, 'US')
+            except NumberParseException:
+                parsed = phonenumbers.parse('+' + cleaned, None)
+        else:
+            parsed = phonenumbers.parse(cleaned, None)
+    except NumberParseException:
+        return None
+    
+    if parsed and phonenumbers.is_valid_number(parsed):
+        return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+    return None
 
 def extract_phone_numbers(text: str) -> List[str]:
     """Extract and validate phone numbers in E164 format"""
     if not text:
         return []
     
-    # Common phone number patterns
-    phone_patterns = [
-        r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
-        r'\+?\d{10,15}',
-        r'\(\d{3}\)\s?\d{3}[-.\s]?\d{4}',
-        r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}',
-        r'\+\d{1,3}\s?\d{1,14}',
-    ]
+    # Collect distinct cleaned candidates so each is validated once
+    candidates = set()
+    for pattern in _PHONE_RES:
+        for match in pattern.findall(text):
+            cleaned = _NONDIGIT_RE.sub('', match)
+            if len(cleaned) >= 10:
+                candidates.add(cleaned)
     
     phone_numbers = set()
-    
-    for pattern in phone_patterns:
-        matches = re.findall(pattern, text)
-        for match in matches:
-            # Clean the number
-            cleaned = re.sub(r'[^\d+]', '', match)
-            if len(cleaned) >= 10:
-                try:
-                    # Try to parse as US number first, then international
-                    parsed = None
-                    if not cleaned.startswith('+'):
-                        try:
-                            parsed = phonenumbers.parse(cleaned, 'US')
-                        except NumberParseException:
-                            try:
-                                parsed = phonenumbers.parse('+' + cleaned, None)
-                            except NumberParseException:
-                                continue
-                    else:
-                        parsed = phonenumbers.parse(cleaned, None)
-                    
-                    if parsed and phonenumbers.is_valid_number(parsed):
-                        e164 = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
-                        phone_numbers.add(e164)
-                except NumberParseException:
-                    continue
+    for cleaned in candidates:
+        e164 = _to_e164(cleaned)
+        if e164:
+            phone_numbers.add(e164)
     
     return list(phone_numbers)
 
 def extract_emails(text: str) -> List[str]:
     """Extract email addresses from text"""
-    if not text:
+    if not text or '@' not in text:
         return []
     
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
+    # Lowercase and dedupe first so each distinct address is filtered once
+    emails = {email.lower() for email in _EMAIL_RE.findall(text)}
     
     # Filter out common false positives
     filtered_emails = []
-    skip_domains = {'example.com', 'test.com', 'domain.com', 'email.com'}
-    
     for email in emails:
-        domain = email.split('@')[1].lower()
-        if domain not in skip_domains and not domain.endswith('.png') and not domain.endswith('.jpg'):
-            filtered_emails.append(email.lower())
+        domain = email.partition('@')[2]
+        if domain not in _SKIP_EMAIL_DOMAINS and not domain.endswith(_SKIP_EMAIL_SUFFIXES):
+            filtered_emails.append(email)
     
-    return list(set(filtered_emails))
+    return filtered_emails
 
 def extract_social_media_urls(text: str, html_content: str = "") -> dict:
     """Extract social media URLs"""
@@ -110,30 +159,12 @@ def extract_social_media_urls(text: str, html_content: str = "") -> dict:
     
     content = f"{text} {html_content}"
     
-    patterns = {
-        'linkedin_url': [
-            r'https?://(?:www\.)?linkedin\.com/(?:company|in)/[A-Za-z0-9\-._~:/?#[\]@!$&\'()*+,;=]+',
-            r'linkedin\.com/(?:company|in)/[A-Za-z0-9\-._~:/?#[\]@!$&\'()*+,;=]+'
-        ],
-        'facebook_url': [
-            r'https?://(?:www\.)?facebook\.com/[A-Za-z0-9\-._~:/?#[\]@!$&\'()*+,;=]+',
-            r'facebook\.com/[A-Za-z0-9\-._~:/?#[\]@!$&\'()*+,;=]+'
-        ],
-        'instagram_url': [
-            r'https?://(?:www\.)?instagram\.com/[A-Za-z0-9\-._~:/?#[\]@!$&\'()*+,;=]+',
-            r'instagram\.com/[A-Za-z0-9\-._~:/?#[\]@!$&\'()*+,;=]+'
-        ],
-        'github_url': [
-            r'https?://(?:www\.)?github\.com/[A-Za-z0-9\-._~:/?#[\]@!$&\'()*+,;=]+',
-            r'github\.com/[A-Za-z0-9\-._~:/?#[\]@!$&\'()*+,;=]+'
-        ]
-    }
-    
-    for social_type, pattern_list in patterns.items():
+    for social_type, pattern_list in _SOCIAL_RES.items():
         for pattern in pattern_list:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            if matches:
-                url = matches[0]
+            # search stops at the first hit, which is the same URL findall()[0] would return
+            match = pattern.search(content)
+            if match:
+                url = match.group()
                 if not url.startswith('http'):
                     url = 'https://' + url
                 social_urls[social_type] = url
@@ -141,42 +172,74 @@ def extract_social_media_urls(text: str, html_content: str = "") -> dict:
     
     return social_urls
 
-def extract_persons_data(text: str, html_content: str = "") -> List[dict]:
-    """Extract person information from text"""
+def extract_persons_data(text: str, emails: List[str], phones: List[str]) -> List[dict]:
+    """Extract person information from text, pairing it with already-extracted emails and phones"""
     persons = []
-    content = f"{text} {html_content}"
     
     # Look for common patterns that indicate person information
     # This is a simplified version - in production, you might use NLP libraries
     
-    # Pattern for "Name - Title" or "Name, Title"
-    name_title_patterns = [
-        r'([A-Z][a-z]+ [A-Z][a-z]+)\s*[-,]\s*([A-Z][^.!?]*?)(?=[.!?]|\n|$)',
-        r'<h[1-6][^>]*>([^<]+)</h[1-6]>',  # Names in headers
-    ]
-    
-    emails = extract_emails(content)
-    phones = extract_phone_numbers(content)
-    
     # Simple extraction - this could be enhanced with NLP
-    for pattern in name_title_patterns:
-        matches = re.findall(pattern, content)
-        for match in matches:
-            if isinstance(match, tuple) and len(match) == 2:
-                name, title = match
-                if len(name.split()) >= 2 and len(name) > 3:  # Basic validation
-                    person = {
-                        'name': name.strip(),
-                        'title': title.strip(),
-                        'email': emails[len(persons)] if len(persons) < len(emails) else '',
-                        'phone': phones[len(persons)] if len(persons) < len(phones) else ''
-                    }
-                    persons.append(person)
-                    if len(persons) >= 5:  # Limit to 5 persons
-                        break
+    for name, title in _NAME_TITLE_RE.findall(text):
+        if len(name.split()) >= 2 and len(name) > 3:  # Basic validation
+            person = {
+                'name': name.strip(),
+                'title': title.strip(),
+                'email': emails[len(persons)] if len(persons) < len(emails) else '',
+                'phone': phones[len(persons)] if len(persons) < len(phones) else ''
+            }
+            persons.append(person)
+            if len(persons) >= 5:  # Limit to 5 persons
+                break
     
     return persons
 
+def extract_company_address(tree: LexborHTMLParser, text_content: str) -> str:
+    """Extract company address from content"""
+    address = ""
+    
+    # Look in structured data (one tree walk for all selectors)
+    for element in tree.css(_ADDRESS_SELECTOR):
+        text = element.text(strip=True)
+        if len(text) > 10 and _ADDRESS_KEYWORDS_RE.search(text):
+            address = text
+            break
+    
+    if not address:
+        for pattern in _ADDRESS_RES:
+            matches = pattern.findall(text_content)
+            if matches:
+                address = matches[0]
+                break
+    
+    return address[:200]  # Limit length
+
+def extract_page_data(html: str) -> dict:
+    """Parse a page and extract all contact fields.
+    
+    Runs in a worker process, so it takes and returns plain data only.
+    """
+    tree = LexborHTMLParser(html)
+    
+    # Remove script and style elements
+    for node in tree.css('script, style'):
+        node.decompose()
+    
+    text_content = tree.body.text(separator=' ') if tree.body else ''
+    
+    phone_numbers = extract_phone_numbers(text_content)
+    emails = extract_emails(text_content)
+    social_urls = extract_social_media_urls(text_content, html)
+    
+    return {
+        'phone_numbers': phone_numbers,
+        'email_address': emails[0] if emails else "",
+        **social_urls,
+        # Reuse the emails and phones found above
+        'persons': extract_persons_data(text_content, emails, phone_numbers),
+        'company_address': extract_company_address(tree, text_content),
+    }
+
 def clean_url(url: str) -> str:
     """Clean and validate URL"""
     if not url:
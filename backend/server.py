@@ -1,5 +1,5 @@
-from fastapi import FastAPI, APIRouter, WebSocket, WebSocketDisconnect, UploadFile, File, Form
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, WebSocket, WebSocketDisconnect, UploadFile, File, Form, Query, Header
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -7,13 +7,14 @@ import os
 import logging
 import json
 import asyncio
+import csv
+import zlib
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 import uuid
 from datetime import datetime, timezone, timedelta
-import pandas as pd
-from io import StringIO, BytesIO
+from io import StringIO, TextIOWrapper
 
 # Import scraping modules
 from scraping.scraper import ScrapingEngine
@@ -24,44 +25,106 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Pool sized for the scrape fan-out; idle sockets are reaped and wire traffic is compressed
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=50,
+    minPoolSize=5,
+    maxIdleTimeMS=60000,
+    serverSelectionTimeoutMS=3000,
+    compressors='zstd,zlib',
+    uuidRepresentation='standard'
+)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Bulk upload template, built once at import
+_TEMPLATE_CSV = b"url\nhttps://example.com\nhttps://company.com\nhttps://startup.io\n"
+
+# CSV download columns, with person details limited to 5 persons
+_PERSON_KEYS = tuple(
+    (f'person_name_{i}', f'person_title_{i}', f'person_email_{i}', f'person_phone_{i}')
+    for i in range(1, 6)
+)
+_DOWNLOAD_COLUMNS = (
+    'input_url', 'phone_numbers', 'email_address',
+    'linkedin_url', 'facebook_url', 'instagram_url', 'github_url',
+) + tuple(key for keys in _PERSON_KEYS for key in keys)
+
 # WebSocket connection manager
 class ConnectionManager:
+    # Messages buffered per client before the oldest are dropped
+    QUEUE_SIZE = 64
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # Each connection gets its own outgoing queue drained by a relay task,
+        # so a slow client never holds up broadcasts to the others; the queues
+        # also serve as the registry of active connections
+        self.queues: Dict[WebSocket, asyncio.Queue] = {}
+        self.tasks: Dict[WebSocket, asyncio.Task] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self.queues[websocket] = queue
+        self.tasks[websocket] = asyncio.create_task(self._relay(websocket, queue))
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        self.queues.pop(websocket, None)
+        task = self.tasks.pop(websocket, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _relay(self, websocket: WebSocket, queue: asyncio.Queue):
+        try:
+            while True:
+                message = await queue.get()
+                await websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Connection closed, remove it
+            self.disconnect(websocket)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                # Connection closed, remove it
-                self.active_connections.remove(connection)
+        for queue in list(self.queues.values()):
+            if queue.full():
+                # A burst can fill the queue before the relay has run; give it a turn first
+                await asyncio.sleep(0)
+            if queue.full():
+                # Still full, so the client is behind: drop the oldest message rather than wait on it
+                queue.get_nowait()
+            queue.put_nowait(message)
 
 manager = ConnectionManager()
 scraping_engine = ScrapingEngine(db, manager)
 
+# Cap how many scrape jobs run at once; later submissions wait their turn
+job_semaphore = asyncio.Semaphore(int(os.environ.get('MAX_CONCURRENT_JOBS', '4')))
+# Strong references to running jobs so they are not garbage collected mid-scrape
+job_tasks: Set[asyncio.Task] = set()
+
+def start_scraping_job(urls: List[str], job_id: str, max_threads: int):
+    async def run():
+        async with job_semaphore:
+            await scraping_engine.scrape_urls(urls, job_id, max_threads)
+    
+    task = asyncio.create_task(run())
+    job_tasks.add(task)
+    task.add_done_callback(job_tasks.discard)
+
 # Define Models
 class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    # Stored as a BSON binary UUID (subtype 4); serialized as a string in responses
+    id: uuid.UUID = Field(default_factory=uuid.uuid4)
     client_name: str
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -95,15 +158,16 @@ async def root():
 
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    # Build the record from the already-validated input instead of re-validating a dict copy
+    status_obj = StatusCheck(client_name=input.client_name)
+    _ = await db.status_checks.insert_one(status_obj.model_dump())
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+@api_router.get("/status", responses={200: {"model": List[StatusCheck]}})
+async def get_status_checks(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    # Documents already match StatusCheck; serialize them directly instead of validating each row
+    cursor = db.status_checks.find({}, {"_id": 0}).skip(skip).limit(limit)
+    return ORJSONResponse(await cursor.to_list(limit))
 
 # Single URL scraping endpoint
 @api_router.post("/scrape/single", response_model=ScrapingResponse)
@@ -120,10 +184,10 @@ async def scrape_single_url(request: SingleUrlRequest):
             created_at=datetime.now(timezone.utc)
         )
         
-        await db.scraping_jobs.insert_one(job.dict())
+        await db.scraping_jobs.insert_one(job.model_dump())
         
         # Start scraping in background
-        asyncio.create_task(scraping_engine.scrape_urls([request.url], job_id, request.max_threads))
+        start_scraping_job([request.url], job_id, request.max_threads)
         
         return ScrapingResponse(
             job_id=job_id,
@@ -138,9 +202,21 @@ async def scrape_single_url(request: SingleUrlRequest):
             message=f"Failed to start scraping: {str(e)}"
         )
 
+def _read_csv_urls(csv_file) -> Optional[List[str]]:
+    """Read the 'url' column of an uploaded CSV row by row; None if there is no such column"""
+    text = TextIOWrapper(csv_file, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(text)
+        if 'url' not in (reader.fieldnames or []):
+            return None
+        return [row['url'] for row in reader if row.get('url')]
+    finally:
+        # Leave the underlying upload open for FastAPI to close
+        text.detach()
+
 # Bulk CSV scraping endpoint
 @api_router.post("/scrape/bulk", response_model=ScrapingResponse)
-async def scrape_bulk_urls(file: UploadFile = File(...), max_threads: int = Form(5)):
+async def scrape_bulk_urls(file: UploadFile = File(...), max_threads: int = Form(5, ge=1, le=25)):
     try:
         if not file.filename.endswith('.csv'):
             return ScrapingResponse(
@@ -149,18 +225,16 @@ async def scrape_bulk_urls(file: UploadFile = File(...), max_threads: int = Form
                 message="Please upload a CSV file"
             )
         
-        # Read CSV file
-        content = await file.read()
-        df = pd.read_csv(StringIO(content.decode('utf-8')))
+        # Parse the CSV off the event loop so other requests and broadcasts keep flowing
+        urls = await asyncio.to_thread(_read_csv_urls, file.file)
         
-        if 'url' not in df.columns:
+        if urls is None:
             return ScrapingResponse(
                 job_id="",
                 status="error",
                 message="CSV must contain a 'url' column"
             )
         
-        urls = df['url'].dropna().tolist()
         if not urls:
             return ScrapingResponse(
                 job_id="",
@@ -174,15 +248,15 @@ async def scrape_bulk_urls(file: UploadFile = File(...), max_threads: int = Form
         job = ScrapingJob(
             id=job_id,
             urls=urls,
-            max_threads=min(max_threads, 25),
+            max_threads=max_threads,
             status="started",
             created_at=datetime.now(timezone.utc)
         )
         
-        await db.scraping_jobs.insert_one(job.dict())
+        await db.scraping_jobs.insert_one(job.model_dump())
         
         # Start scraping in background
-        asyncio.create_task(scraping_engine.scrape_urls(urls, job_id, min(max_threads, 25)))
+        start_scraping_job(urls, job_id, max_threads)
         
         return ScrapingResponse(
             job_id=job_id,
@@ -201,86 +275,117 @@ async def scrape_bulk_urls(file: UploadFile = File(...), max_threads: int = Form
 @api_router.get("/scrape/job/{job_id}")
 async def get_job_status(job_id: str):
     try:
-        job = await db.scraping_jobs.find_one({"id": job_id})
+        job = await db.scraping_jobs.find_one({"id": job_id}, {"_id": 0})
         if not job:
             return {"error": "Job not found"}
         
-        # Convert ObjectId to string for JSON serialization
-        if "_id" in job:
-            job["_id"] = str(job["_id"])
-        
-        # Convert datetime objects to ISO strings
-        for field in ["created_at", "completed_at"]:
-            if field in job and job[field]:
-                job[field] = job[field].isoformat()
-        
-        return job
+        # orjson serializes the datetime fields directly
+        return ORJSONResponse(job)
     except Exception as e:
         logging.error(f"Error getting job status: {e}")
         return {"error": str(e)}
 
 # Get scraped results for a job
 @api_router.get("/scrape/results/{job_id}")
-async def get_job_results(job_id: str):
+async def get_job_results(job_id: str, skip: int = Query(0, ge=0), limit: int = Query(1000, ge=1, le=1000)):
     try:
-        results = await db.scraped_data.find({"job_id": job_id}).to_list(1000)
+        cursor = db.scraped_data.find({"job_id": job_id}, {"_id": 0}).skip(skip).limit(limit)
+        results = await cursor.to_list(limit)
         
-        # Convert ObjectId and datetime objects for JSON serialization
-        for result in results:
-            if "_id" in result:
-                result["_id"] = str(result["_id"])
-            if "scraped_at" in result and result["scraped_at"]:
-                result["scraped_at"] = result["scraped_at"].isoformat()
-        
-        return {"results": results, "count": len(results)}
+        # orjson serializes the datetime fields directly, skipping jsonable_encoder
+        return ORJSONResponse({"results": results, "count": len(results)})
     except Exception as e:
         logging.error(f"Error getting job results: {e}")
         return {"error": str(e)}
 
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honoring q-values (q=0 refuses a coding)"""
+    qvalues = {}
+    for item in accept_encoding.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding.lower()] = q
+    # An explicit gzip entry takes precedence over the * wildcard
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qvalues:
+            return qvalues[coding] > 0
+    return False
+
 # Download results as CSV
 @api_router.get("/scrape/download/{job_id}")
-async def download_results(job_id: str):
+async def download_results(job_id: str, accept_encoding: str = Header("")):
     try:
-        results = await db.scraped_data.find({"job_id": job_id}).sort("_id", 1).to_list(1000)
+        cursor = db.scraped_data.find({"job_id": job_id}).sort("_id", 1).batch_size(500)
+        first = await anext(cursor, None)
         
-        if not results:
+        if not first:
             return {"error": "No results found for this job"}
         
-        # Convert to DataFrame
-        df_data = []
-        for result in results:
-            row = {
-                'input_url': result.get('url', ''),
-                'phone_numbers': ', '.join(result.get('phone_numbers', [])),
-                'email_address': result.get('email_address', ''),
-                'linkedin_url': result.get('linkedin_url', ''),
-                'facebook_url': result.get('facebook_url', ''),
-                'instagram_url': result.get('instagram_url', ''),
-                'github_url': result.get('github_url', ''),
-            }
+        def result_row(result):
+            row = [
+                result.get('url', ''),
+                ', '.join(result.get('phone_numbers', [])),
+                result.get('email_address', ''),
+                result.get('linkedin_url', ''),
+                result.get('facebook_url', ''),
+                result.get('instagram_url', ''),
+                result.get('github_url', ''),
+            ]
             
             # Add person details
-            persons = result.get('persons', [])
-            for i, person in enumerate(persons[:5], 1):  # Limit to 5 persons
-                row[f'person_name_{i}'] = person.get('name', '')
-                row[f'person_title_{i}'] = person.get('title', '')
-                row[f'person_email_{i}'] = person.get('email', '')
-                row[f'person_phone_{i}'] = person.get('phone', '')
+            persons = result.get('persons', [])[:len(_PERSON_KEYS)]
+            for person in persons:
+                row += [person.get('name', ''), person.get('title', ''), person.get('email', ''), person.get('phone', '')]
+            row += [''] * (len(_DOWNLOAD_COLUMNS) - len(row))
+            return row
+        
+        async def generate_csv():
+            # Stream one row at a time straight from the cursor instead of building a DataFrame
+            buffer = StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
             
-            df_data.append(row)
+            def flush():
+                data = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+                return data.encode('utf-8')
+            
+            writer.writerow(_DOWNLOAD_COLUMNS)
+            writer.writerow(result_row(first))
+            yield flush()
+            
+            async for result in cursor:
+                writer.writerow(result_row(result))
+                yield flush()
         
-        df = pd.DataFrame(df_data)
+        async def gzip_csv():
+            # Level 1 keeps CPU cost low while still shrinking the repetitive CSV text several-fold
+            compressor = zlib.compressobj(1, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            async for chunk in generate_csv():
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+            yield compressor.flush()
         
-        # Create CSV response
-        output = BytesIO()
-        df.to_csv(output, index=False, encoding='utf-8')
-        output.seek(0)
+        headers = {
+            "Content-Disposition": f"attachment; filename=scraping_results_{job_id}.csv",
+            # The body depends on Accept-Encoding, so caches must key on it
+            "Vary": "Accept-Encoding",
+        }
+        if _accepts_gzip(accept_encoding):
+            headers["Content-Encoding"] = "gzip"
+            return StreamingResponse(gzip_csv(), media_type="text/csv", headers=headers)
         
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename=scraping_results_{job_id}.csv"}
-        )
+        return StreamingResponse(generate_csv(), media_type="text/csv", headers=headers)
     except Exception as e:
         logging.error(f"Error downloading results: {e}")
         return {"error": str(e)}
@@ -288,28 +393,11 @@ async def download_results(job_id: str):
 # Sample CSV template download
 @api_router.get("/scrape/template")
 async def download_template():
-    try:
-        template_data = {
-            'url': [
-                'https://example.com',
-                'https://company.com',
-                'https://startup.io'
-            ]
-        }
-        df = pd.DataFrame(template_data)
-        
-        output = BytesIO()
-        df.to_csv(output, index=False, encoding='utf-8')
-        output.seek(0)
-        
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=bulk_scraping_template.csv"}
-        )
-    except Exception as e:
-        logging.error(f"Error creating template: {e}")
-        return {"error": str(e)}
+    return Response(
+        content=_TEMPLATE_CSV,
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=bulk_scraping_template.csv"}
+    )
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -329,6 +417,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    # Results are upserted per (url, job_id) and the cache is looked up by url
+    try:
+        await db.scraped_data.create_index([("url", 1), ("job_id", 1)], unique=True)
+        await db.scraped_cache.create_index("url", unique=True)
+    except Exception as e:
+        logger.error(f"Error creating indexes: {e}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await scraping_engine.close_session()
+    client.close()
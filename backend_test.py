@@ -4,10 +4,9 @@ Comprehensive Backend API Testing for Realtime Webscraper
 Tests all API endpoints and WebSocket functionality
 """
 
-import requests
+import httpx
 import sys
 import json
-import time
 import asyncio
 import websockets
 import threading
@@ -24,6 +23,8 @@ class WebScraperAPITester:
         self.tests_passed = 0
         self.ws_messages = []
         self.ws_connected = False
+        # One client for the whole run so connections are reused across tests
+        self.client = httpx.AsyncClient(base_url=f"{self.api_url}/", timeout=30)
 
     def log_test(self, name, success, details=""):
         """Log test results"""
@@ -35,22 +36,21 @@ class WebScraperAPITester:
             print(f"❌ {name} - FAILED {details}")
         return success
 
-    def run_api_test(self, name, method, endpoint, expected_status, data=None, files=None):
+    async def run_api_test(self, name, method, endpoint, expected_status, data=None, files=None):
         """Run a single API test"""
         url = f"{self.api_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'} if not files else {}
         
         print(f"\n🔍 Testing {name}...")
         print(f"   URL: {url}")
         
         try:
             if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
+                response = await self.client.get(endpoint)
             elif method == 'POST':
                 if files:
-                    response = requests.post(url, files=files, data=data, timeout=30)
+                    response = await self.client.post(endpoint, files=files, data=data)
                 else:
-                    response = requests.post(url, json=data, headers=headers, timeout=30)
+                    response = await self.client.post(endpoint, json=data)
             
             success = response.status_code == expected_status
             details = f"Status: {response.status_code}"
@@ -112,29 +112,29 @@ class WebScraperAPITester:
         csv_content = df.to_csv(index=False)
         return csv_content
 
-    def test_basic_endpoints(self):
+    async def test_basic_endpoints(self):
         """Test basic API endpoints"""
         print("\n" + "="*60)
         print("PHASE 1: BASIC API ENDPOINT TESTING")
         print("="*60)
         
-        # Test root endpoint
-        self.run_api_test(
-            "Root API Endpoint",
-            "GET",
-            "",
-            200
-        )
-        
-        # Test CSV template download
-        success, response = self.run_api_test(
-            "CSV Template Download",
-            "GET", 
-            "scrape/template",
-            200
+        # Test root endpoint and CSV template download
+        await asyncio.gather(
+            self.run_api_test(
+                "Root API Endpoint",
+                "GET",
+                "",
+                200
+            ),
+            self.run_api_test(
+                "CSV Template Download",
+                "GET", 
+                "scrape/template",
+                200
+            )
         )
 
-    def test_scraping_endpoints(self):
+    async def test_scraping_endpoints(self):
         """Test scraping functionality"""
         print("\n" + "="*60)
         print("PHASE 2: SCRAPING ENDPOINT TESTING")
@@ -146,7 +146,7 @@ class WebScraperAPITester:
             "max_threads": 1
         }
         
-        success, response = self.run_api_test(
+        success, response = await self.run_api_test(
             "Single URL Scraping",
             "POST",
             "scrape/single",
@@ -160,22 +160,22 @@ class WebScraperAPITester:
             print(f"   Job ID: {job_id}")
             
             # Wait a moment for job to start
-            time.sleep(2)
+            await asyncio.sleep(2)
             
-            # Test job status endpoint
-            self.run_api_test(
-                "Job Status Check",
-                "GET",
-                f"scrape/job/{job_id}",
-                200
-            )
-            
-            # Test job results endpoint
-            self.run_api_test(
-                "Job Results Check",
-                "GET",
-                f"scrape/results/{job_id}",
-                200
+            # Test job status and results endpoints
+            await asyncio.gather(
+                self.run_api_test(
+                    "Job Status Check",
+                    "GET",
+                    f"scrape/job/{job_id}",
+                    200
+                ),
+                self.run_api_test(
+                    "Job Results Check",
+                    "GET",
+                    f"scrape/results/{job_id}",
+                    200
+                )
             )
         
         # Test bulk CSV upload
@@ -183,7 +183,7 @@ class WebScraperAPITester:
         files = {'file': ('test_urls.csv', csv_content, 'text/csv')}
         form_data = {'max_threads': '2'}
         
-        success, response = self.run_api_test(
+        success, response = await self.run_api_test(
             "Bulk CSV Upload",
             "POST",
             "scrape/bulk",
@@ -199,7 +199,7 @@ class WebScraperAPITester:
         
         return job_id, bulk_job_id
 
-    def test_download_endpoints(self, job_id):
+    async def test_download_endpoints(self, job_id):
         """Test download functionality"""
         print("\n" + "="*60)
         print("PHASE 3: DOWNLOAD ENDPOINT TESTING")
@@ -208,7 +208,7 @@ class WebScraperAPITester:
         if job_id:
             # Wait for some processing time
             print("   Waiting 10 seconds for scraping to process...")
-            time.sleep(10)
+            await asyncio.sleep(10)
             
             # Test results download
             url = f"{self.api_url}/scrape/download/{job_id}"
@@ -216,7 +216,7 @@ class WebScraperAPITester:
             print(f"   URL: {url}")
             
             try:
-                response = requests.get(url, timeout=30)
+                response = await self.client.get(f"scrape/download/{job_id}")
                 success = response.status_code == 200
                 
                 if success:
@@ -239,7 +239,7 @@ class WebScraperAPITester:
         
         await self.test_websocket_connection()
 
-    def test_error_handling(self):
+    async def test_error_handling(self):
         """Test error handling scenarios"""
         print("\n" + "="*60)
         print("PHASE 5: ERROR HANDLING TESTING")
@@ -251,33 +251,34 @@ class WebScraperAPITester:
             "max_threads": 1
         }
         
-        success, response = self.run_api_test(
-            "Invalid URL Handling",
-            "POST",
-            "scrape/single",
-            200,  # API should return 200 but with error status
-            data=invalid_url_data
-        )
-        
         # Test invalid CSV upload
         invalid_files = {'file': ('test.txt', 'not a csv file', 'text/plain')}
         form_data = {'max_threads': '2'}
         
-        self.run_api_test(
-            "Invalid File Upload",
-            "POST",
-            "scrape/bulk",
-            200,  # API should return 200 but with error status
-            data=form_data,
-            files=invalid_files
-        )
-        
-        # Test non-existent job ID
-        self.run_api_test(
-            "Non-existent Job Status",
-            "GET",
-            "scrape/job/non-existent-job-id",
-            200  # API returns 200 with error message
+        # The error cases are independent, so run them concurrently
+        await asyncio.gather(
+            self.run_api_test(
+                "Invalid URL Handling",
+                "POST",
+                "scrape/single",
+                200,  # API should return 200 but with error status
+                data=invalid_url_data
+            ),
+            self.run_api_test(
+                "Invalid File Upload",
+                "POST",
+                "scrape/bulk",
+                200,  # API should return 200 but with error status
+                data=form_data,
+                files=invalid_files
+            ),
+            # Test non-existent job ID
+            self.run_api_test(
+                "Non-existent Job Status",
+                "GET",
+                "scrape/job/non-existent-job-id",
+                200  # API returns 200 with error message
+            )
         )
 
     def print_summary(self):
@@ -310,14 +311,17 @@ async def main():
     
     tester = WebScraperAPITester()
     
-    # Run synchronous tests
-    tester.test_basic_endpoints()
-    job_id, bulk_job_id = tester.test_scraping_endpoints()
-    tester.test_download_endpoints(job_id)
-    tester.test_error_handling()
-    
-    # Run WebSocket tests
-    await tester.run_websocket_tests()
+    try:
+        # Run HTTP tests
+        await tester.test_basic_endpoints()
+        job_id, bulk_job_id = await tester.test_scraping_endpoints()
+        await tester.test_download_endpoints(job_id)
+        await tester.test_error_handling()
+        
+        # Run WebSocket tests
+        await tester.run_websocket_tests()
+    finally:
+        await tester.client.aclose()
     
     # Print summary and return result
     all_passed = tester.print_summary()